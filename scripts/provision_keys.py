@@ -1,13 +1,36 @@
 import argparse
 import asyncio
 import base64
+import binascii
 
 from bleak import BleakClient, BleakScanner
+from bleak.exc import BleakError
 
 
 SERVICE_UUID = "12345678-1234-5678-1234-56789abcdef0"
 APPLE_KEY_UUID = "12345678-1234-5678-1234-56789abcdef1"
 GOOGLE_KEY_UUID = "12345678-1234-5678-1234-56789abcdef2"
+STATUS_UUID = "12345678-1234-5678-1234-56789abcdef3"
+
+# Status notification sent by the firmware once both keys are stored
+STATUS_KEYS_RECEIVED = 0x01
+
+# Largest ATT MTU the firmware accepts (CONFIG_BT_L2CAP_TX_MTU)
+TARGET_MTU = 247
+
+
+async def negotiate_mtu(client: BleakClient) -> int:
+    """Return the ATT MTU negotiated for this connection.
+
+    BlueZ exchanges the MTU on connect but bleak keeps reporting the default
+    23 until it is explicitly acquired; other backends already report it.
+    """
+    if hasattr(client._backend, "_acquire_mtu"):
+        try:
+            await client._backend._acquire_mtu()
+        except (BleakError, EOFError) as e:
+            print(f"Could not acquire MTU ({e}), using {client.mtu_size}")
+    return min(client.mtu_size, TARGET_MTU)
 
 
 async def main() -> None:
@@ -15,13 +38,21 @@ async def main() -> None:
     parser.add_argument("--name", default="HYBRID-TAG", help="BLE name to match")
     parser.add_argument("--key", default="WPS9RJBtGkPLvMvFBhvKkofMabkdsdiPzLBSzg==", help="28-byte Apple key (base64)")
     parser.add_argument("--keyGoogle", default="34aaaffb11e8bf854630bd2ce56fa6b06603b20b", help="20-byte Google key (hex)")
+    parser.add_argument("--verbose", action="store_true", help="List services and characteristics after connecting")
     args = parser.parse_args()
 
-    apple_key = base64.b64decode(args.key)
+    # Reject malformed keys before spending time on the scan
+    try:
+        apple_key = base64.b64decode(args.key, validate=True)
+    except binascii.Error as e:
+        raise SystemExit(f"Apple key is not valid base64: {e}")
     if len(apple_key) != 28:
         raise SystemExit("Apple key must be 28 bytes")
 
-    google_key = bytes.fromhex(args.keyGoogle)
+    try:
+        google_key = bytes.fromhex(args.keyGoogle)
+    except ValueError as e:
+        raise SystemExit(f"Google key is not valid hex: {e}")
     if len(google_key) != 20:
         raise SystemExit("Google key must be 20 bytes")
 
@@ -31,34 +62,63 @@ async def main() -> None:
         raise SystemExit(f"Device '{args.name}' not found")
 
     print(f"Found {device.name}, connecting...")
-    async with BleakClient(device) as client:
+    async with BleakClient(device, services=[SERVICE_UUID]) as client:
         print("Connected")
 
         # List services and characteristics
-        for service in client.services:
-            print(f"Service: {service.uuid}")
-            for char in service.characteristics:
-                print(f"  Characteristic: {char.uuid}")
-                print(f"  Properties: {char.properties}")
+        if args.verbose:
+            for service in client.services:
+                print(f"Service: {service.uuid}")
+                for char in service.characteristics:
+                    print(f"  Characteristic: {char.uuid}")
+                    print(f"  Properties: {char.properties}")
 
         # Get MTU
-        mtu = client.mtu_size
+        mtu = await negotiate_mtu(client)
         print(f"\nMTU: {mtu} bytes (max write: {mtu - 3} bytes)")
 
-        # Split Apple key into chunks that fit within MTU
-        chunk_size = mtu - 3  # 20 bytes for MTU 23
+        # The firmware accepts the Apple key whole (28 bytes) or as 20 + 8, so
+        # send it in one write when it fits (MTU >= 31), otherwise split at 20
+        chunk_size = len(apple_key) if mtu - 3 >= len(apple_key) else 20
         print(f"\nWriting Apple key ({len(apple_key)} bytes) in {(len(apple_key) + chunk_size - 1) // chunk_size} chunks...")
 
-        for i in range(0, len(apple_key), chunk_size):
-            chunk = apple_key[i:i + chunk_size]
-            print(f"  Writing chunk {i // chunk_size + 1}: {len(chunk)} bytes (offset {i})")
-            await client.write_gatt_char(APPLE_KEY_UUID, chunk, response=True)
-
+        # Subscribe before writing so the confirmation cannot be missed
+        done = asyncio.Event()
+
+        def on_status(_, data: bytearray) -> None:
+            if data and data[0] == STATUS_KEYS_RECEIVED:
+                done.set()
+
+        try:
+            await client.start_notify(STATUS_UUID, on_status)
+        except BleakError as e:
+            raise SystemExit(f"Cannot subscribe to status ({e}); firmware has no status characteristic, reflash") from None
+
+        # Queue every write at once without response so BlueZ can pack several
+        # PDUs into one connection event. Tasks start in creation order, so the
+        # chunks still reach the firmware in sequence; the status notification
+        # replaces the per-write acknowledgements. Chunks are memoryview
+        # slices, so they share the key buffer instead of copying it.
+        apple_view = memoryview(apple_key)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for i in range(0, len(apple_key), chunk_size):
+                    chunk = apple_view[i:i + chunk_size]
+                    print(f"  Writing chunk {i // chunk_size + 1}: {len(chunk)} bytes (offset {i})")
+                    tg.create_task(client.write_gatt_char(APPLE_KEY_UUID, chunk, response=False))
+
+                # Write Google key (20 bytes fits in single write)
+                print(f"\nWriting Google key ({len(google_key)} bytes)...")
+                tg.create_task(client.write_gatt_char(GOOGLE_KEY_UUID, google_key, response=False))
+        except ExceptionGroup as eg:
+            raise SystemExit(f"Failed to write keys: {eg.exceptions[0]}") from None
+
+        try:
+            await asyncio.wait_for(done.wait(), 5.0)
+        except asyncio.TimeoutError:
+            raise SystemExit("Device did not confirm the keys") from None
+        await client.stop_notify(STATUS_UUID)
         print("Apple key written!")
-
-        # Write Google key (20 bytes fits in single write)
-        print(f"\nWriting Google key ({len(google_key)} bytes)...")
-        await client.write_gatt_char(GOOGLE_KEY_UUID, google_key, response=True)
         print("Google key written!")
 
         print("\nDone! Both keys configured.")
@@ -62,12 +62,29 @@ static void check_keys_and_start(void)
 	}
 }
 
+/* Log the now complete Apple key and start advertising if all keys are in */
+static void apple_key_complete(void)
+{
+	printk("Complete apple key: ");
+	for (int i = 0; i < APPLE_KEY_SIZE; i++) {
+		printk("%02x ", apple_key[i]);
+	}
+	printk("\n");
+	apple_key_part2_received = true;
+	check_keys_and_start();
+}
+
 static ssize_t write_apple_key(struct bt_conn *conn,
 					 const struct bt_gatt_attr *attr,
 					 const void *buf, uint16_t len, uint16_t offset,
 					 uint8_t flags)
 {
-	if (len == 20) {
+	if (len == APPLE_KEY_SIZE) {
+		/* Whole key in a single write (negotiated MTU >= 31) */
+		memcpy(apple_key, buf, APPLE_KEY_SIZE);
+		apple_key_part1_received = true;
+		apple_key_complete();
+	} else if (len == 20) {
 		/* First chunk: 20 bytes at offset 0 */
 		memcpy(apple_key, buf, 20);
 		apple_key_part1_received = true;
@@ -76,16 +93,13 @@ static ssize_t write_apple_key(struct bt_conn *conn,
 		/* Second chunk: 8 bytes at offset 20 */
 		memcpy(&apple_key[20], buf, 8);
 		printk("Apple key part 2 received (8 bytes)\n");
-		printk("Complete apple key: ");
-		for (int i = 0; i < 28; i++) {
-			printk("%02x ", apple_key[i]);
-		}
-		printk("\n");
-		apple_key_part2_received = true;
-		check_keys_and_start();
+		apple_key_complete();
 	} else {
 		printk("Unexpected write: %u bytes (part1_received=%d)\n", len, apple_key_part1_received);
 	}
+	if (keys_received()) {
+		notify_keys_received(conn);
+	}
 	return len;
 }
 
@@ -106,21 +120,46 @@ static ssize_t write_google_key(struct bt_conn *conn,
 	} else {
 		printk("Unexpected Google key write: %u bytes (expected %d)\n", len, GOOGLE_KEY_SIZE);
 	}
+	if (keys_received()) {
+		notify_keys_received(conn);
+	}
 	return len;
 }
 
 BT_GATT_SERVICE_DEFINE(config_svc,
 	BT_GATT_PRIMARY_SERVICE(&config_service_uuid),
 	BT_GATT_CHARACTERISTIC(&write_apple_key_cmd_uuid.uuid,
-				   BT_GATT_CHRC_WRITE,
+				   BT_GATT_CHRC_WRITE | BT_GATT_CHRC_WRITE_WITHOUT_RESP,
 				   BT_GATT_PERM_WRITE, NULL,
 				   write_apple_key, &apple_key),
 	BT_GATT_CHARACTERISTIC(&write_google_key_cmd_uuid.uuid,
-				   BT_GATT_CHRC_WRITE,
+				   BT_GATT_CHRC_WRITE | BT_GATT_CHRC_WRITE_WITHOUT_RESP,
 				   BT_GATT_PERM_WRITE, NULL,
 				   write_google_key, &google_key),
+	BT_GATT_CHARACTERISTIC(&status_uuid.uuid,
+				   BT_GATT_CHRC_NOTIFY,
+				   BT_GATT_PERM_NONE, NULL, NULL, NULL),
+	BT_GATT_CCC(NULL, BT_GATT_PERM_READ | BT_GATT_PERM_WRITE),
 );
 
+/* Tell the connected provisioning client the keys are stored */
+static void notify_keys_received(struct bt_conn *conn)
+{
+	static const uint8_t status = STATUS_KEYS_RECEIVED;
+	const struct bt_gatt_attr *attr = bt_gatt_find_by_uuid(config_svc.attrs, config_svc.attr_count,
+								 &status_uuid.uuid);
+
+	/* Older provisioning scripts never subscribe; nobody to tell then */
+	if (!bt_gatt_is_subscribed(conn, attr, BT_GATT_CCC_NOTIFY)) {
+		return;
+	}
+
+	int err = bt_gatt_notify(conn, attr, &status, sizeof(status));
+	if (err) {
+		printk("Failed to notify status (err %d)\n", err);
+	}
+}
+
 static const struct bt_data config_ad[] = {
 	BT_DATA_BYTES(BT_DATA_FLAGS, (BT_LE_AD_GENERAL | BT_LE_AD_NO_BREDR)),
 	BT_DATA_BYTES(BT_DATA_UUID128_ALL, BT_UUID_CUSTOM_SERVICE_VAL),
@@ -20,6 +20,12 @@ static const struct bt_uuid_128 write_apple_key_cmd_uuid = BT_UUID_INIT_128(
 static const struct bt_uuid_128 write_google_key_cmd_uuid = BT_UUID_INIT_128(
     BT_UUID_128_ENCODE(0x12345678, 0x1234, 0x5678, 0x1234, 0x56789abcdef2));
 
+static const struct bt_uuid_128 status_uuid = BT_UUID_INIT_128(
+    BT_UUID_128_ENCODE(0x12345678, 0x1234, 0x5678, 0x1234, 0x56789abcdef3));
+
+/* Status notification values */
+#define STATUS_KEYS_RECEIVED 0x01
+
 #define APPLE_FINDMY_PAYLOAD_SIZE 29
 
 /* Protocol selection */
@@ -32,6 +38,7 @@ static void protocol_switcher(struct k_timer *timer);
 
 K_TIMER_DEFINE(protocol_timer, protocol_switcher, NULL);
 
+static void notify_keys_received(struct bt_conn *conn);
 static void set_mac_address(void);
 static int start_advertising(void);
 static void start_scan(void);